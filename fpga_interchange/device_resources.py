@@ -11,6 +11,7 @@
 
 from collections import namedtuple
 import enum
+import sys
 from .logical_netlist import Direction
 from fpga_interchange.constraints.model import Constraints
 from fpga_interchange.parameter_definitions import ParameterFormat, ParameterDefinition
@@ -670,7 +671,9 @@ class DeviceResources():
 
     def __init__(self, device_resource_capnp):
         self.device_resource_capnp = device_resource_capnp
-        self.strs = [s for s in self.device_resource_capnp.strList]
+        # Interned, as these strings end up as keys of most of the lookup
+        # tables built from the device.
+        self.strs = [sys.intern(s) for s in self.device_resource_capnp.strList]
 
         self.string_index = {}
         for idx, s in enumerate(self.strs):
@@ -832,7 +832,7 @@ def to_physical_netlist(phys_netlist_capnp):
                 other_cell_name=other_cell_name)
 
         for other_bel in placement_capnp.otherBels:
-            placement.other_bels.add(strs[other_bel])
+            placement.other_bels[strs[other_bel]] = None
 
         phys_netlist.add_placement(placement)
 
@@ -19,7 +19,9 @@ Useful starting points:
 """
 
 import enum
+import sys
 from collections import namedtuple
+from itertools import islice
 from .route_stitching import RoutingTree, stitch_segments, flatten_segments
 
 
@@ -82,7 +84,10 @@ class Placement():
         self.bel = bel
 
         self.pins = []
-        self.other_bels = set()
+
+        # Dict used as an insertion ordered set, so other BELs are written
+        # in a deterministic order.
+        self.other_bels = {}
 
     def add_bel_pin_to_cell_pin(self,
                                 bel_pin,
@@ -99,7 +104,7 @@ class Placement():
         if bel is None:
             bel = self.bel
         elif bel != self.bel:
-            self.other_bels.add(bel)
+            self.other_bels[bel] = None
 
         self.pins.append(
             Pin(
@@ -112,11 +117,35 @@ class Placement():
 
 
 def descend_branch(obj, node, string_id):
-    """ Descend a branch to continue outputting the interchange to capnp object. """
-    obj.init('branches', len(node.branches))
+    """ Descend a branch to continue outputting the interchange to capnp object.
+
+    The branches are walked with an explicit stack rather than by recursion,
+    so deep routing trees are written from a single Python frame.
+
+    """
+    branch_objs = obj.init('branches', len(node.branches))
+    stack = list(zip(branch_objs, node.branches))
+
+    # Branches are pushed in reverse, so the tree is written in the same
+    # depth first order as a recursive descent would.
+    stack.reverse()
+    while stack:
+        obj, node = stack.pop()
 
-    for branch_obj, branch in zip(obj.branches, node.branches):
-        branch.output_interchange(branch_obj, string_id)
+        # Linear runs of segments (e.g. pip chains from chain_pips) are
+        # written directly, without going through the stack.
+        while True:
+            node.output_route_segment(obj, string_id)
+
+            branches = node.branches
+            branch_objs = obj.init('branches', len(branches))
+            if len(branches) != 1:
+                break
+
+            obj = branch_objs[0]
+            node = branches[0]
+
+        stack.extend(reversed(list(zip(branch_objs, branches))))
 
 
 class PhysicalBelPin():
@@ -135,6 +164,7 @@ class PhysicalBelPin():
         self.pin = pin
 
         self.branches = []
+        self._tuple = None
 
     def output_interchange(self, obj, string_id):
         """ Output this route segment and all branches beneth it.
@@ -145,13 +175,16 @@ class PhysicalBelPin():
                                  string list.
 
         """
-        obj.routeSegment.init('belPin')
-        obj.routeSegment.belPin.site = string_id(self.site)
-        obj.routeSegment.belPin.bel = string_id(self.bel)
-        obj.routeSegment.belPin.pin = string_id(self.pin)
-
+        self.output_route_segment(obj, string_id)
         descend_branch(obj, self, string_id)
 
+    def output_route_segment(self, obj, string_id):
+        """ Output this route segment, without the branches beneth it. """
+        bel_pin = obj.routeSegment.init('belPin')
+        bel_pin.site = string_id(self.site)
+        bel_pin.bel = string_id(self.bel)
+        bel_pin.pin = string_id(self.pin)
+
     def get_device_resource(self, site_types, device_resources):
         """ Get device resource that corresponds to this class. """
         return device_resources.bel_pin(self.site, site_types[self.site],
@@ -163,8 +196,13 @@ class PhysicalBelPin():
         This tuple is used for sorting against other routing branch objects
         to generate a canonical routing tree.
 
+        The tuple is computed once and cached on the object.
+
         """
-        return ('bel_pin', self.site, self.bel, self.pin)
+        if self._tuple is None:
+            self._tuple = ('bel_pin', self.site, self.bel, self.pin)
+
+        return self._tuple
 
     def __str__(self):
         return 'PhysicalBelPin({}, {}, {})'.format(
@@ -187,6 +225,7 @@ class PhysicalSitePin():
         self.pin = pin
 
         self.branches = []
+        self._tuple = None
 
     def output_interchange(self, obj, string_id):
         """ Output this route segment and all branches beneth it.
@@ -197,12 +236,15 @@ class PhysicalSitePin():
                                  string list.
 
         """
-        obj.routeSegment.init('sitePin')
-        obj.routeSegment.sitePin.site = string_id(self.site)
-        obj.routeSegment.sitePin.pin = string_id(self.pin)
-
+        self.output_route_segment(obj, string_id)
         descend_branch(obj, self, string_id)
 
+    def output_route_segment(self, obj, string_id):
+        """ Output this route segment, without the branches beneth it. """
+        site_pin = obj.routeSegment.init('sitePin')
+        site_pin.site = string_id(self.site)
+        site_pin.pin = string_id(self.pin)
+
     def get_device_resource(self, site_types, device_resources):
         """ Get device resource that corresponds to this class. """
         return device_resources.site_pin(self.site, site_types[self.site],
@@ -214,8 +256,13 @@ class PhysicalSitePin():
         This tuple is used for sorting against other routing branch objects
         to generate a canonical routing tree.
 
+        The tuple is computed once and cached on the object.
+
         """
-        return ('site_pin', self.site, self.pin)
+        if self._tuple is None:
+            self._tuple = ('site_pin', self.site, self.pin)
+
+        return self._tuple
 
     def __str__(self):
         return 'PhysicalSitePin({}, {})'.format(
@@ -244,6 +291,7 @@ class PhysicalPip():
         self.site = site
 
         self.branches = []
+        self._tuple = None
 
     def output_interchange(self, obj, string_id):
         """ Output this route segment and all branches beneth it.
@@ -254,15 +302,18 @@ class PhysicalPip():
                                  string list.
 
         """
-        obj.routeSegment.init('pip')
-        obj.routeSegment.pip.tile = string_id(self.tile)
-        obj.routeSegment.pip.wire0 = string_id(self.wire0)
-        obj.routeSegment.pip.wire1 = string_id(self.wire1)
-        obj.routeSegment.pip.forward = self.forward
-        obj.routeSegment.pip.isFixed = True
-
+        self.output_route_segment(obj, string_id)
         descend_branch(obj, self, string_id)
 
+    def output_route_segment(self, obj, string_id):
+        """ Output this route segment, without the branches beneth it. """
+        pip = obj.routeSegment.init('pip')
+        pip.tile = string_id(self.tile)
+        pip.wire0 = string_id(self.wire0)
+        pip.wire1 = string_id(self.wire1)
+        pip.forward = self.forward
+        pip.isFixed = True
+
     def get_device_resource(self, site_types, device_resources):
         """ Get device resource that corresponds to this class. """
         return device_resources.pip(self.tile, self.wire0, self.wire1)
@@ -273,8 +324,13 @@ class PhysicalPip():
         This tuple is used for sorting against other routing branch objects
         to generate a canonical routing tree.
 
+        The tuple is computed once and cached on the object.
+
         """
-        return ('pip', self.tile, self.wire0, self.wire1)
+        if self._tuple is None:
+            self._tuple = ('pip', self.tile, self.wire0, self.wire1)
+
+        return self._tuple
 
     def __str__(self):
         return 'PhysicalPip({}, {}, {}, {}, {})'.format(
@@ -305,6 +361,7 @@ class PhysicalSitePip():
         self.is_inverting = is_inverting
 
         self.branches = []
+        self._tuple = None
 
     def output_interchange(self, obj, string_id):
         """ Output this route segment and all branches beneth it.
@@ -315,14 +372,17 @@ class PhysicalSitePip():
                                  string list.
 
         """
-        obj.routeSegment.init('sitePIP')
-        obj.routeSegment.sitePIP.site = string_id(self.site)
-        obj.routeSegment.sitePIP.bel = string_id(self.bel)
-        obj.routeSegment.sitePIP.pin = string_id(self.pin)
-        obj.routeSegment.sitePIP.isInverting = self.is_inverting
-
+        self.output_route_segment(obj, string_id)
         descend_branch(obj, self, string_id)
 
+    def output_route_segment(self, obj, string_id):
+        """ Output this route segment, without the branches beneth it. """
+        site_pip = obj.routeSegment.init('sitePIP')
+        site_pip.site = string_id(self.site)
+        site_pip.bel = string_id(self.bel)
+        site_pip.pin = string_id(self.pin)
+        site_pip.isInverting = self.is_inverting
+
     def get_device_resource(self, site_types, device_resources):
         """ Get device resource that corresponds to this class. """
         return device_resources.site_pip(self.site, site_types[self.site],
@@ -334,8 +394,14 @@ class PhysicalSitePip():
         This tuple is used for sorting against other routing branch objects
         to generate a canonical routing tree.
 
+        The tuple is computed once and cached on the object.
+
         """
-        return ('site_pip', self.site, self.bel, self.pin, self.is_inverting)
+        if self._tuple is None:
+            self._tuple = ('site_pip', self.site, self.bel, self.pin,
+                           self.is_inverting)
+
+        return self._tuple
 
     def __str__(self):
         return 'PhysicalSitePip({}, {}, {}, {})'.format(
@@ -346,6 +412,31 @@ class PhysicalSitePip():
         )
 
 
+def site_pin_from_tuple(site_name, tup):
+    _, pin = tup
+    return PhysicalSitePin(site_name, pin)
+
+
+def bel_pin_from_tuple(site_name, tup):
+    assert len(tup) == 3, tup
+    _, bel, pin = tup
+    return PhysicalBelPin(site_name, bel, pin)
+
+
+def site_pip_from_tuple(site_name, tup):
+    _, bel, pin = tup
+    return PhysicalSitePip(site_name, bel, pin)
+
+
+# Map of physical netlist tuple kind to the function that converts the tuple
+# into the matching Physical* object.
+TUPLE_TO_OBJECT = {
+    'site_pin': site_pin_from_tuple,
+    'bel_pin': bel_pin_from_tuple,
+    'site_pip': site_pip_from_tuple,
+}
+
+
 def convert_tuple_to_object(site, tup):
     """ Convert physical netlist tuple to object.
 
@@ -389,18 +480,10 @@ def convert_tuple_to_object(site, tup):
     'BPIN'
 
     """
-    if tup[0] == 'site_pin':
-        _, pin = tup
-        return PhysicalSitePin(site.name, pin)
-    elif tup[0] == 'bel_pin':
-        assert len(tup) == 3, tup
-        _, bel, pin = tup
-        return PhysicalBelPin(site.name, bel, pin)
-    elif tup[0] == 'site_pip':
-        _, bel, pin = tup
-        return PhysicalSitePip(site.name, bel, pin)
-    else:
-        assert False, tup
+    convert = TUPLE_TO_OBJECT.get(tup[0])
+    assert convert is not None, tup
+
+    return convert(site.name, tup)
 
 
 def add_site_routing_children(site, parent_obj, parent_key, site_routing,
@@ -418,31 +501,36 @@ def add_site_routing_children(site, parent_obj, parent_key, site_routing,
                            constant 0 net)
 
     """
-    if parent_key in site_routing:
-        for child in site_routing[parent_key]:
-            if child[0] == 'inverter':
-                if inverted_root is not None:
-                    for child2 in site_routing[child]:
-                        obj = convert_tuple_to_object(site, child2)
-                        inverted_root.append(obj)
-
-                        # Continue to descend, but no more inverted root.
-                        # There should be no double site inverters (hopefully?)
-                        add_site_routing_children(
-                            site,
-                            obj,
-                            child2,
-                            site_routing,
-                            inverted_root=None)
-                else:
-                    add_site_routing_children(site, parent_obj, child,
-                                              site_routing, inverted_root)
+    # Stack of (list to add the converted child to, child site routing tuple,
+    # inverted root).  Children are pushed in reverse so that objects are
+    # added in the same depth first order as a recursive descent.
+    stack = [(parent_obj.branches, child, inverted_root)
+             for child in site_routing.get(parent_key, ())]
+    stack.reverse()
+
+    while stack:
+        branches, child, inverted_root = stack.pop()
+
+        if child[0] == 'inverter':
+            if inverted_root is not None:
+                # Continue to descend, but no more inverted root.
+                # There should be no double site inverters (hopefully?)
+                children = []
+                for child2 in site_routing[child]:
+                    assert child2[0] != 'inverter', (child, child2)
+                    children.append((inverted_root, child2, None))
             else:
-                obj = convert_tuple_to_object(site, child)
-                parent_obj.branches.append(obj)
+                children = [(branches, child2, inverted_root)
+                            for child2 in site_routing.get(child, ())]
+        else:
+            obj = convert_tuple_to_object(site, child)
+            branches.append(obj)
+
+            children = [(obj.branches, child2, inverted_root)
+                        for child2 in site_routing.get(child, ())]
 
-                add_site_routing_children(site, obj, child, site_routing,
-                                          inverted_root)
+        children.reverse()
+        stack.extend(children)
 
 
 def create_site_routing(site, net_roots, site_routing, constant_nets):
@@ -489,9 +577,9 @@ class PhysicalNetlist:
 
     """
 
-    def __init__(self, part, properties={}):
+    def __init__(self, part, properties=None):
         self.part = part
-        self.properties = {}
+        self.properties = dict(properties) if properties else {}
 
         self.placements = []
         self.nets = []
@@ -580,7 +668,8 @@ class PhysicalNetlist:
                          be reconstructed.
 
         """
-        for idx, net in enumerate(self.nets):
+        nets = []
+        for net in self.nets:
             segments = net.sources + net.stubs
             if flatten:
                 segments = flatten_segments(segments)
@@ -588,12 +677,15 @@ class PhysicalNetlist:
             sources, stubs = stitch_segments(device_resources,
                                              self.site_instances, segments)
 
-            self.nets[idx] = PhysicalNet(
-                name=net.name,
-                type=net.type,
-                sources=sources,
-                stubs=stubs,
-            )
+            nets.append(
+                PhysicalNet(
+                    name=net.name,
+                    type=net.type,
+                    sources=sources,
+                    stubs=stubs,
+                ))
+
+        self.nets = nets
 
     def get_normalized_tuple_tree(self, device_resources):
         """ Return physical nets in canonical tuple form.
@@ -669,18 +761,23 @@ def chain_branches(segments):
     Returns the root of the tree.
 
     """
-    for parent, child in zip(segments[:-1], segments[1:]):
+    for parent, child in zip(segments, islice(segments, 1, None)):
         parent.branches.append(child)
 
     return segments[0]
 
 
 def chain_pips(tile, wires):
-    """ Chain a set of pips into a branch tree structure. """
-    segments = []
+    """ Chain a set of pips into a branch tree structure.
 
-    for wire0, wire1 in zip(wires[:-1], wires[1:]):
-        segments.append(
-            PhysicalPip(tile=tile, wire0=wire0, wire1=wire1, forward=True))
+    Tile and wire names are interned, as the same names are repeated across
+    many pips and are later used as sort and dictionary keys.
+
+    """
+    tile = sys.intern(tile)
+    wires = [sys.intern(wire) for wire in wires]
 
-    return tuple(segments)
+    return tuple(
+        PhysicalPip(
+            tile=tile, wire0=wires[idx], wire1=wires[idx + 1], forward=True)
+        for idx in range(len(wires) - 1))
@@ -8,8 +8,9 @@
 # https://opensource.org/licenses/ISC
 #
 # SPDX-License-Identifier: ISC
+from array import array
 from enum import Enum
-from collections import namedtuple
+from collections import namedtuple, defaultdict
 import itertools
 
 from fpga_interchange.chip_info import ChipInfo, BelShortedPins, BelInfo, TileTypeInfo, \
@@ -46,20 +47,26 @@ class BelCategory(Enum):
     SITE_PORT = 2
 
 
+# Keyed by the string name of the capnp Direction enum.
+DIRECTION_TO_TYPE = {
+    'input': PortType.PORT_IN,
+    'output': PortType.PORT_OUT,
+    'inout': PortType.PORT_INOUT,
+}
+
+
 def direction_to_type(direction):
-    if direction == 'input':
-        return PortType.PORT_IN
-    elif direction == 'output':
-        return PortType.PORT_OUT
-    else:
-        assert direction == 'inout'
-        return PortType.PORT_INOUT
+    return DIRECTION_TO_TYPE[str(direction)]
 
 
 BelPin = namedtuple('BelPin', 'port type wire')
 
 
 class FlattenedBel():
+    __slots__ = ('name', 'type', 'site_index', 'bel_index', 'bel_category',
+                 'ports', 'non_inverting_pin', 'inverting_pin', 'valid_cells',
+                 'lut_element', 'connected_pins')
+
     def __init__(self, name, type, site_index, bel_index, bel_category,
                  lut_element):
         self.name = name
@@ -71,20 +78,21 @@ class FlattenedBel():
         self.non_inverting_pin = -1
         self.inverting_pin = -1
 
-        self.valid_cells = set()
+        self.valid_cells = ()
         self.lut_element = lut_element
         self.connected_pins = []
 
-    def add_port(self, device, bel_pin, wire_index):
+    def add_port(self, name, direction, wire_index):
         self.ports.append(
             BelPin(
-                port=device.strs[bel_pin.name],
-                type=direction_to_type(bel_pin.dir),
-                wire=wire_index))
+                port=name, type=direction_to_type(direction), wire=wire_index))
 
 
 # Object that represents a flattened wire.
 class FlattenedWire():
+    __slots__ = ('type', 'name', 'wire_index', 'site_index', 'bel_pins',
+                 'pips_uphill', 'pips_downhill')
+
     def __init__(self, type, name, wire_index, site_index):
         self.type = type
         self.name = name
@@ -96,60 +104,81 @@ class FlattenedWire():
         self.pips_downhill = []
 
 
-class FlattenedPip(
-        namedtuple(
-            'FlattenedPip',
-            'type src_index dst_index site_index pip_index pseudo_cell_wires')
-):
-    pass
+# Object that represents a flattened pip.
+class FlattenedPip():
+    __slots__ = ('type', 'src_index', 'dst_index', 'site_index', 'pip_index',
+                 'pseudo_cell_wires')
+
+    def __init__(self, type, src_index, dst_index, site_index, pip_index,
+                 pseudo_cell_wires):
+        self.type = type
+        self.src_index = src_index
+        self.dst_index = dst_index
+        self.site_index = site_index
+        self.pip_index = pip_index
+        self.pseudo_cell_wires = pseudo_cell_wires
+
 
+# Object that represents a flattened site.
+class FlattenedSite():
+    __slots__ = ('site_in_type_index', 'site_type_index', 'site_type',
+                 'site_type_name', 'site_variant', 'bel_to_bel_index',
+                 'bel_pin_to_site_wire_index', 'bel_pin_index_to_bel_index')
 
-class FlattenedSite(
-        namedtuple(
-            'FlattenedSite',
-            'site_in_type_index site_type_index site_type site_type_name site_variant bel_to_bel_index bel_pin_to_site_wire_index bel_pin_index_to_bel_index'
-        )):
-    pass
+    def __init__(self, site_in_type_index, site_type_index, site_type,
+                 site_type_name, site_variant, bel_to_bel_index,
+                 bel_pin_to_site_wire_index, bel_pin_index_to_bel_index):
+        self.site_in_type_index = site_in_type_index
+        self.site_type_index = site_type_index
+        self.site_type = site_type
+        self.site_type_name = site_type_name
+        self.site_variant = site_variant
+        self.bel_to_bel_index = bel_to_bel_index
+        self.bel_pin_to_site_wire_index = bel_pin_to_site_wire_index
+        self.bel_pin_index_to_bel_index = bel_pin_index_to_bel_index
 
 
 def emit_constraints(tile_type, tile_constraints, cell_bel_mapper):
     flat_tag_indicies = {}
     flat_tag_state_indicies = {}
 
-    for idx, (tag_prefix, tag_data) in enumerate(
-            sorted(tile_constraints.tags.items())):
+    tags = tile_constraints.tags
+    for idx, tag_prefix in enumerate(sorted(tags)):
+        tag_data = tags[tag_prefix]
         flat_tag_indicies[tag_prefix] = idx
-        flat_tag_state_indicies[tag_prefix] = {}
 
         tag = ConstraintTag()
         tag.tag_prefix = tag_prefix
         tag.default_state = tag_data.default
         tag.states = sorted(tag_data.states)
 
-        for idx, state in enumerate(tag.states):
-            flat_tag_state_indicies[tag_prefix][state] = idx
+        flat_tag_state_indicies[tag_prefix] = {
+            state: idx
+            for idx, state in enumerate(tag.states)
+        }
 
         tile_type.tags.append(tag)
 
+    get_cell_bel_map_index = cell_bel_mapper.get_cell_bel_map_index
+    tile_type_name = tile_type.name
     for (cell_type, site_index, site_type,
          bel), constraints in tile_constraints.bel_cell_constraints.items():
-        idx = cell_bel_mapper.get_cell_bel_map_index(
-            cell_type, tile_type.name, site_index, site_type, bel)
+        idx = get_cell_bel_map_index(cell_type, tile_type_name, site_index,
+                                     site_type, bel)
 
         outs = []
         for tag_prefix, constraint in constraints:
             out = CellConstraint()
             out.tag = flat_tag_indicies[tag_prefix]
+            tag_state_indicies = flat_tag_state_indicies[tag_prefix]
 
             if isinstance(constraint, ImpliesConstraint):
                 out.constraint_type = ConstraintType.TAG_IMPLIES
-                out.states.append(
-                    flat_tag_state_indicies[tag_prefix][constraint.state])
+                out.states.append(tag_state_indicies[constraint.state])
             elif isinstance(constraint, RequiresConstraint):
                 out.constraint_type = ConstraintType.TAG_REQUIRES
-                for state in constraint.states:
-                    out.states.append(
-                        flat_tag_state_indicies[tag_prefix][state])
+                out.states.extend(
+                    tag_state_indicies[state] for state in constraint.states)
             else:
                 assert False, type(constraint)
 
@@ -170,26 +199,29 @@ class LutElementsEmitter():
             lut_element = LutElement(lut_element_idx)
             lut_elements.append(lut_element)
 
-            lut_element.width = lut.width
+            width = lut.width
+            lut_element.width = width
 
             for bel in lut.bels:
                 lut_bel = LutBel()
                 lut_element.lut_bels.append(lut_bel)
 
-                lut_bel.name = bel.name
-                for pin in bel.inputPins:
-                    lut_bel.pins.append(pin)
+                bel_name = bel.name
+                lut_bel.name = bel_name
+                lut_bel.pins.extend(bel.inputPins)
 
                 lut_bel.out_pin = bel.outputPin
 
-                assert bel.lowBit < lut.width
-                assert bel.highBit < lut.width
+                low_bit = bel.lowBit
+                high_bit = bel.highBit
+                assert low_bit < width
+                assert high_bit < width
 
-                lut_bel.low_bit = bel.lowBit
-                lut_bel.high_bit = bel.highBit
+                lut_bel.low_bit = low_bit
+                lut_bel.high_bit = high_bit
 
-                assert bel.name not in output_map, (bel.name, )
-                output_map[bel.name] = lut_element_idx
+                assert bel_name not in output_map, (bel_name, )
+                output_map[bel_name] = lut_element_idx
 
         return output_map
 
@@ -198,14 +230,16 @@ class FlattenedTileType():
     def __init__(self, device, tile_type_index, tile_type, cell_bel_mapper,
                  constraints, lut_elements, disabled_routethrus,
                  disabled_site_pips):
-        self.tile_type_name = device.strs[tile_type.name]
+        strs = device.strs
+
+        self.tile_type_name = strs[tile_type.name]
         self.tile_type = tile_type
 
         self.tile_constraints = ConstraintPrototype()
 
         self.sites = []
         self.bels = []
-        self.bel_index_remap = {}
+        self.bel_index_remap = []
         self.wires = []
 
         self.pips = []
@@ -216,25 +250,28 @@ class FlattenedTileType():
         self.disabled_site_pips = disabled_site_pips
 
         # Add tile wires
-        self.tile_wire_to_wire_in_tile_index = {}
-        for wire_in_tile_index, wire in enumerate(tile_type.wires):
-            name = device.strs[wire]
-            self.tile_wire_to_wire_in_tile_index[name] = wire_in_tile_index
-
-            flat_wire = FlattenedWire(
+        #
+        # Tile wires are the first wires in the tile type, so they are added
+        # in one go rather than one add_wire call at a time.
+        tile_wire_names = [strs[wire] for wire in tile_type.wires]
+        self.tile_wire_to_wire_in_tile_index = {
+            name: wire_in_tile_index
+            for wire_in_tile_index, name in enumerate(tile_wire_names)
+        }
+        self.wires.extend(
+            FlattenedWire(
                 type=FlattenedWireType.TILE_WIRE,
                 name=name,
                 wire_index=wire_in_tile_index,
                 site_index=None)
-            self.add_wire(flat_wire)
+            for wire_in_tile_index, name in enumerate(tile_wire_names))
 
         # Add pips, collecting pseudo_pips for later processing.
         pseudo_pips = []
         for idx, pip in enumerate(tile_type.pips):
             is_pseudo_cell = pip.which() == 'pseudoCells'
-            if is_pseudo_cell and any(
-                (device.strs[pcell.bel] in disabled_routethrus)
-                    for pcell in pip.pseudoCells):
+            if is_pseudo_cell and any((strs[pcell.bel] in disabled_routethrus)
+                                      for pcell in pip.pseudoCells):
                 # Skip pseudo pips through disabled cells
                 continue
 
@@ -273,6 +310,22 @@ class FlattenedTileType():
         #
         # FIXME: This data is likely incomplete.  We need a cell type and cell
         # pin -> bel pin as well to have enough information.
+        #
+        # Index site pin pips by source and destination wire, so each pseudo
+        # pip can find the sites it intersects without scanning every pip.
+        src_to_sites = defaultdict(set)
+        dst_to_sites = defaultdict(set)
+        for other_pip in self.pips:
+            if other_pip.type != FlattenedPipType.SITE_PIN:
+                continue
+
+            src_to_sites[other_pip.src_index].add(other_pip.site_index)
+            dst_to_sites[other_pip.dst_index].add(other_pip.site_index)
+
+        bels_by_site = defaultdict(list)
+        for bel in self.bels:
+            bels_by_site[bel.site_index].append(bel)
+
         for pip_index, pip in pseudo_pips:
             flat_pip = self.pips[pip_index]
             pseudo_cell_wires = set()
@@ -280,12 +333,12 @@ class FlattenedTileType():
             pseudo_cell_pins_needed = set()
             assert pip.which() == 'pseudoCells'
             for pseudo_cell in pip.pseudoCells:
-                bel_name = device.strs[pseudo_cell.bel]
+                bel_name = strs[pseudo_cell.bel]
                 if bel_name not in pseudo_cell_pins:
                     pseudo_cell_pins[bel_name] = set()
 
                 for pin in pseudo_cell.pins:
-                    pin_name = device.strs[pin]
+                    pin_name = strs[pin]
                     pseudo_cell_pins[bel_name].add(pin_name)
 
                     # Build list of expected BEL pin matches
@@ -293,42 +346,35 @@ class FlattenedTileType():
 
             # Find all sites that this pseudo pip intersects with
             sites = set()
-            for other_pip in self.pips:
-                if other_pip.type != FlattenedPipType.SITE_PIN:
-                    continue
-
-                if flat_pip.src_index == other_pip.src_index:
-                    sites.add(other_pip.site_index)
-
-                if flat_pip.dst_index == other_pip.dst_index:
-                    sites.add(other_pip.site_index)
-
-            for bel in self.bels:
-                # This bel isn't in a site that this pseudo pip uses.
-                if bel.site_index not in sites:
-                    continue
-
-                if bel.name in pseudo_cell_pins:
-                    pins = pseudo_cell_pins[bel.name]
+            if flat_pip.src_index in src_to_sites:
+                sites |= src_to_sites[flat_pip.src_index]
+            if flat_pip.dst_index in dst_to_sites:
+                sites |= dst_to_sites[flat_pip.dst_index]
+
+            # Only bels in a site that this pseudo pip uses matter.
+            for site_index in sites:
+                for bel in bels_by_site.get(site_index, ()):
+                    pins = pseudo_cell_pins.get(bel.name)
+                    if pins is None:
+                        continue
 
                     for port in bel.ports:
-                        if port.port in pins:
-                            pseudo_cell_pins_needed.discard((bel.name,
-                                                             port.port))
+                        if port.port not in pins:
+                            continue
 
-                            if port.type == PortType.PORT_OUT:
-                                # Only record wires driven by BEL pin outputs.
-                                # BEL pin inputs do not consume the wire.
-                                if port.wire != -1:
-                                    pseudo_cell_wires.add(port.wire)
+                        pseudo_cell_pins_needed.discard((bel.name, port.port))
+
+                        if port.type == PortType.PORT_OUT:
+                            # Only record wires driven by BEL pin outputs.
+                            # BEL pin inputs do not consume the wire.
+                            if port.wire != -1:
+                                pseudo_cell_wires.add(port.wire)
 
             # Make sure every BEL pin from the database matches at least 1
             # instance (possibly more!).
             assert len(pseudo_cell_pins_needed) == 0
 
-            self.pips[pip_index].pseudo_cell_wires.clear()
-            self.pips[pip_index].pseudo_cell_wires.extend(
-                sorted(pseudo_cell_wires))
+            flat_pip.pseudo_cell_wires = sorted(pseudo_cell_wires)
 
         self.remap_bel_indicies()
         self.generate_constraints(constraints)
@@ -348,14 +394,12 @@ class FlattenedTileType():
         tags_for_tile_type = {}
         available_placements = []
 
-        sites_in_tile_type = {}
+        sites_in_tile_type = defaultdict(list)
         for site_index, site in enumerate(self.sites):
-            if site.site_in_type_index not in sites_in_tile_type:
-                sites_in_tile_type[site.site_in_type_index] = []
-
             sites_in_tile_type[site.site_in_type_index].append(site_index)
 
         # Create tag to ensure that each site in the tile only has 1 type.
+        type_of_site_tags = {}
         for site, possible_sites in sites_in_tile_type.items():
             site_types = []
             for site_index in possible_sites:
@@ -365,6 +409,7 @@ class FlattenedTileType():
             assert len(site_types) == len(set(site_types))
 
             tag_prefix = 'type_of_site{:03d}'.format(site)
+            type_of_site_tags[site] = tag_prefix
             assert tag_prefix not in tags_for_tile_type
             tags_for_tile_type[tag_prefix] = Tag(
                 name='TypeOfSite{}'.format(site),
@@ -374,50 +419,59 @@ class FlattenedTileType():
             self.tile_constraints.add_tag(tag_prefix,
                                           tags_for_tile_type[tag_prefix])
 
+        tile_type_name = self.tile_type_name
+        tile_constraints = self.tile_constraints
+        add_tag = tile_constraints.add_tag
+        add_constraint = tile_constraints.add_cell_placement_constraint
+        yield_tags = constraints.yield_tags_at_placement
+        yield_cell_constraints = \
+            constraints.yield_constraints_for_cell_type_at_placement
         for bel in self.bels:
-            site = self.sites[bel.site_index]
+            site_index = bel.site_index
+            bel_name = bel.name
+            site = self.sites[site_index]
+            site_type_name = site.site_type_name
+            site_in_type_index = site.site_in_type_index
+            type_of_site_tag = type_of_site_tags[site_in_type_index]
+
             placement = Placement(
-                tile=self.tile_type_name,
-                site='site{}_{}'.format(site.site_in_type_index,
-                                        site.site_type_name),
-                tile_type=self.tile_type_name,
-                site_type=site.site_type_name,
-                bel=bel.name)
+                tile=tile_type_name,
+                site='site{}_{}'.format(site_in_type_index, site_type_name),
+                tile_type=tile_type_name,
+                site_type=site_type_name,
+                bel=bel_name)
             available_placements.append(placement)
 
-            for tag_prefix, tag in constraints.yield_tags_at_placement(
-                    placement):
+            for tag_prefix, tag in yield_tags(placement):
                 if tag_prefix in tags_for_tile_type:
                     assert tags_for_tile_type[tag_prefix] is tag
                     continue
                 else:
                     tags_for_tile_type[tag_prefix] = tag
-                    self.tile_constraints.add_tag(
-                        tag_prefix, tags_for_tile_type[tag_prefix])
+                    add_tag(tag_prefix, tags_for_tile_type[tag_prefix])
 
             for cell_type in bel.valid_cells:
                 # When any valid cell type is placed here, make sure that
                 # the corrisponding TypeOfSite tag is implied.
-                self.tile_constraints.add_cell_placement_constraint(
+                add_constraint(
                     cell_type=cell_type,
-                    site_index=bel.site_index,
-                    site_type=site.site_type_name,
-                    bel=bel.name,
-                    tag='type_of_site{:03d}'.format(
-                        self.sites[bel.site_index].site_in_type_index),
+                    site_index=site_index,
+                    site_type=site_type_name,
+                    bel=bel_name,
+                    tag=type_of_site_tag,
                     constraint=ImpliesConstraint(
                         tag=None,
-                        state=site.site_type_name,
+                        state=site_type_name,
                         matchers=None,
                         port=None))
 
-                for tag, constraint in constraints.yield_constraints_for_cell_type_at_placement(
+                for tag, constraint in yield_cell_constraints(
                         cell_type, placement):
-                    self.tile_constraints.add_cell_placement_constraint(
+                    add_constraint(
                         cell_type=cell_type,
-                        site_index=bel.site_index,
-                        site_type=site.site_type_name,
-                        bel=bel.name,
+                        site_index=site_index,
+                        site_type=site_type_name,
+                        bel=bel_name,
                         tag=tag,
                         constraint=constraint)
 
@@ -471,8 +525,17 @@ class FlattenedTileType():
         bel_pin_to_site_wire_index = {}
         bel_pin_index_to_bel_index = {}
 
+        strs = device.strs
+
         site_type = device.device_resource_capnp.siteTypeList[site_type_index]
-        site_type_name = device.strs[site_type.name]
+        site_type_name = strs[site_type.name]
+        site_bels = site_type.bels
+        site_bel_pins = site_type.belPins
+
+        # Decode BEL and BEL pin names once, they are looked up repeatedly
+        # while adding BELs and site pips.
+        bel_names = [strs[bel.name] for bel in site_bels]
+        bel_pin_names = [strs[bel_pin.name] for bel_pin in site_bel_pins]
 
         self.sites.append(
             FlattenedSite(
@@ -487,7 +550,7 @@ class FlattenedTileType():
 
         # Add site wires
         for idx, site_wire in enumerate(site_type.siteWires):
-            wire_name = device.strs[site_wire.name]
+            wire_name = strs[site_wire.name]
             flat_wire = FlattenedWire(
                 type=FlattenedWireType.SITE_WIRE,
                 name=wire_name,
@@ -500,18 +563,20 @@ class FlattenedTileType():
                 bel_pin_to_site_wire_index[pin] = site_wire_index
 
         # Add BELs
-        for bel_idx, bel in enumerate(site_type.bels):
-            if bel.category == 'logic':
+        for bel_idx, bel in enumerate(site_bels):
+            category = bel.category
+            if category == 'logic':
                 bel_category = BelCategory.LOGIC
-            elif bel.category == 'routing':
+            elif category == 'routing':
                 bel_category = BelCategory.ROUTING
             else:
-                assert bel.category == 'sitePort', bel.category
+                assert category == 'sitePort', category
                 bel_category = BelCategory.SITE_PORT
 
+            bel_name = bel_names[bel_idx]
             flat_bel = FlattenedBel(
-                name=device.strs[bel.name],
-                type=device.strs[bel.type],
+                name=bel_name,
+                type=strs[bel.type],
                 site_index=site_index,
                 bel_index=bel_idx,
                 bel_category=bel_category,
@@ -519,31 +584,32 @@ class FlattenedTileType():
                     lut_elements=lut_elements,
                     site_type_name=site_type_name,
                     site_index=site_index,
-                    bel_name=device.strs[bel.name],
+                    bel_name=bel_name,
                 ))
             bel_index = len(self.bels)
             bel_to_bel_index[bel_idx] = bel_index
             self.bels.append(flat_bel)
 
-            bel_key = site_type_name, flat_bel.name
-            for cell in cell_bel_mapper.get_cells():
-                if bel_key in cell_bel_mapper.bels_for_cell(cell):
-                    flat_bel.valid_cells.add(cell)
+            # The mapper's cell sets are frozen, so share them rather than
+            # copying them per BEL.
+            flat_bel.valid_cells = cell_bel_mapper.cells_for_bel(
+                site_type_name, bel_name)
 
             shorted_pins = {}
             for pin_idx, pin in enumerate(bel.pins):
                 assert pin not in bel_pin_index_to_bel_index
                 bel_pin_index_to_bel_index[pin] = bel_idx, pin_idx
 
-                bel_pin = site_type.belPins[pin]
+                bel_pin = site_bel_pins[pin]
+                bel_pin_name = bel_pin_names[pin]
                 wire_idx = bel_pin_to_site_wire_index.get(pin, -1)
-                flat_bel.add_port(device, bel_pin, wire_idx)
+                flat_bel.add_port(bel_pin_name, bel_pin.dir, wire_idx)
                 if wire_idx != -1:
-                    self.wires[wire_idx].bel_pins.append(
-                        (bel_index, device.strs[bel_pin.name]))
+                    self.wires[wire_idx].bel_pins.append((bel_index,
+                                                          bel_pin_name))
                     if wire_idx not in shorted_pins:
                         shorted_pins[wire_idx] = []
-                    shorted_pins[wire_idx].append(bel_pin.name)
+                    shorted_pins[wire_idx].append(bel_pin_name)
 
             for wire, pins in shorted_pins.items():
                 if len(pins) < 2:
@@ -551,8 +617,7 @@ class FlattenedTileType():
                 for pin1, pin2 in itertools.product(pins, repeat=2):
                     if pin1 == pin2:
                         continue
-                    flat_bel.connected_pins.append(
-                        BelShortedPins(device.strs[pin1], device.strs[pin2]))
+                    flat_bel.connected_pins.append(BelShortedPins(pin1, pin2))
 
             # If this BEL is a local inverter, mark which BEL port is the
             # inverting vs non-inverting input.
@@ -576,15 +641,15 @@ class FlattenedTileType():
             dst_bel_pin = site_pip.outpin
             dst_site_wire_idx = bel_pin_to_site_wire_index[dst_bel_pin]
 
-            src_pin_name_idx = site_type.belPins[src_bel_pin].name
-            dst_pin_name_idx = site_type.belPins[dst_bel_pin].name
-            bel_name_idx = site_type.bels[bel_idx].name
+            src_pin_name = bel_pin_names[src_bel_pin]
+            dst_pin_name = bel_pin_names[dst_bel_pin]
+            bel_name = bel_names[bel_idx]
 
             disable_pip = False
             for dis_pip in self.disabled_site_pips:
-                if device.strs[bel_name_idx] in dis_pip["bels"] and \
-                        dis_pip["ipin"] == device.strs[src_pin_name_idx] and \
-                        dis_pip["opin"] == device.strs[dst_pin_name_idx]:
+                if bel_name in dis_pip["bels"] and \
+                        dis_pip["ipin"] == src_pin_name and \
+                        dis_pip["opin"] == dst_pin_name:
                     disable_pip = True
                     break
 
@@ -595,6 +660,11 @@ class FlattenedTileType():
                               idx)
 
         # Add site pins
+        primary_tile_wires = site_type_in_tile_type.primaryPinsToTileWires
+        if site_variant != -1:
+            parent_pins = site_type_in_tile_type.altPinsToPrimaryPins[
+                site_variant].pins
+
         for idx, site_pin in enumerate(site_type.pins):
             # This site pin isn't connected in this site type, skip creating
             # the edge.
@@ -605,15 +675,12 @@ class FlattenedTileType():
 
             if site_variant != -1:
                 # This is an alternative site, map to primary pin first
-                parent_pins = site_type_in_tile_type.altPinsToPrimaryPins[
-                    site_variant]
-                primary_idx = parent_pins.pins[idx]
+                primary_idx = parent_pins[idx]
             else:
                 # This is the primary site, directly lookup site tile wire.
                 primary_idx = idx
 
-            tile_wire_name = device.strs[site_type_in_tile_type.
-                                         primaryPinsToTileWires[primary_idx]]
+            tile_wire_name = strs[primary_tile_wires[primary_idx]]
             tile_wire = self.tile_wire_to_wire_in_tile_index[tile_wire_name]
 
             if site_pin.dir == 'input':
@@ -661,21 +728,41 @@ class FlattenedTileType():
 
     def remap_bel_indicies(self):
         # Put logic BELs first before routing and site ports.
-        self.bel_index_remap = {}
-        self.bel_output_map = {}
-        for output_bel_idx, (bel_idx, _) in enumerate(
-                sorted(
-                    enumerate(self.bels),
-                    key=lambda value: (value[1].bel_category.value, value[0]))
-        ):
+        #
+        # Both maps are indexed by a dense BEL index, so they are plain lists.
+        #
+        # BEL indices are visited in order, so bucketing by category keeps
+        # each bucket sorted by BEL index without a comparison sort.
+        buckets = [[] for _ in BelCategory]
+        for bel_idx, bel in enumerate(self.bels):
+            buckets[bel.bel_category.value].append(bel_idx)
+
+        self.bel_output_map = [
+            bel_idx for bucket in buckets for bel_idx in bucket
+        ]
+        self.bel_index_remap = [None] * len(self.bel_output_map)
+        for output_bel_idx, bel_idx in enumerate(self.bel_output_map):
             self.bel_index_remap[bel_idx] = output_bel_idx
-            self.bel_output_map[output_bel_idx] = bel_idx
 
     def create_tile_type_info(self, cell_bel_mapper):
         tile_type = TileTypeInfo()
         tile_type.name = self.tile_type_name
         tile_type.lut_elements = self.lut_elements
 
+        cells = cell_bel_mapper.get_cells()
+        get_cell_bel_map_index = cell_bel_mapper.get_cell_bel_map_index
+        tile_type_name = tile_type.name
+
+        # Per site and per BEL fields read by the loops below.
+        site_variants = [site.site_variant for site in self.sites]
+        site_type_names = [site.site_type_name for site in self.sites]
+        bel_categories = [bel.bel_category.value for bel in self.bels]
+        site_bel_buckets = [
+            cell_bel_mapper.bel_buckets_for_site_type(site.site_type_index)
+            for site in self.sites
+        ]
+        bel_index_remap = self.bel_index_remap
+
         bels_used = set()
         for bel_index in range(len(self.bels)):
             mapped_idx = self.bel_output_map[bel_index]
@@ -693,26 +780,27 @@ class FlattenedTileType():
                 bel_info.wires.append(port.wire)
 
             bel_info.site = bel.site_index
-            bel_info.site_variant = self.sites[bel.site_index].site_variant
+            bel_info.site_variant = site_variants[bel.site_index]
             bel_info.bel_category = bel.bel_category.value
             bel_info.lut_element = bel.lut_element
             bel_info.non_inverting_pin = bel.non_inverting_pin
             bel_info.inverting_pin = bel.inverting_pin
             bel_info.connected_pins = bel.connected_pins
 
-            site_type = self.sites[bel.site_index].site_type_name
+            site_type = site_type_names[bel.site_index]
 
-            bel_key = (site_type, bel.name)
-            bel_info.bel_bucket = cell_bel_mapper.bel_to_bel_bucket(*bel_key)
+            bel_buckets = site_bel_buckets[bel.site_index]
+            bel_info.bel_bucket = bel_buckets[bel.bel_index]
 
             if bel.bel_category == BelCategory.LOGIC:
                 # Don't need pin_map for routing / site ports.
-                bel_info.pin_map = [-1 for _ in cell_bel_mapper.get_cells()]
-                for idx, cell in enumerate(cell_bel_mapper.get_cells()):
-                    bel_info.pin_map[
-                        idx] = cell_bel_mapper.get_cell_bel_map_index(
-                            cell, tile_type.name, bel.site_index, site_type,
-                            bel.name)
+                site_index = bel.site_index
+                bel_name = bel.name
+                bel_info.pin_map = [
+                    get_cell_bel_map_index(cell, tile_type_name, site_index,
+                                           site_type, bel_name)
+                    for cell in cells
+                ]
 
             tile_type.bel_data.append(bel_info)
 
@@ -727,21 +815,21 @@ class FlattenedTileType():
 
             for (bel_index, port) in wire.bel_pins:
                 bel_port = BelPort()
-                bel_port.bel_index = self.bel_index_remap[bel_index]
+                bel_port.bel_index = bel_index_remap[bel_index]
                 bel_port.port = port
 
                 wire_info.bel_pins.append(bel_port)
 
             if wire.site_index is not None:
                 wire_info.site = wire.site_index
-                wire_info.site_variant = self.sites[wire.
-                                                    site_index].site_variant
+                wire_info.site_variant = site_variants[wire.site_index]
             else:
                 wire_info.site = -1
                 wire_info.site_variant = -1
 
             tile_type.wire_data.append(wire_info)
 
+        bel_data = tile_type.bel_data
         for pip in self.pips:
             pip_info = PipInfo()
 
@@ -749,40 +837,43 @@ class FlattenedTileType():
             pip_info.dst_index = pip.dst_index
             pip_info.pseudo_cell_wires = pip.pseudo_cell_wires
 
-            if pip.site_index is not None:
-                site = self.sites[pip.site_index]
+            site_index = pip.site_index
+            pip_type = pip.type
+            if site_index is not None:
+                site = self.sites[site_index]
                 site_type = site.site_type
 
-                pip_info.site = pip.site_index
-                pip_info.site_variant = site.site_variant
+                pip_info.site = site_index
+                pip_info.site_variant = site_variants[site_index]
 
-                if pip.type == FlattenedPipType.SITE_PIP:
+                if pip_type == FlattenedPipType.SITE_PIP:
                     site_pip = site_type.sitePIPs[pip.pip_index]
                     bel_idx, pin_idx = site.bel_pin_index_to_bel_index[
                         site_pip.inpin]
                     orig_bel_index = site.bel_to_bel_index[bel_idx]
-                    expected_category = self.bels[orig_bel_index].bel_category
+                    expected_category = bel_categories[orig_bel_index]
                     assert expected_category in [
-                        BelCategory.ROUTING, BelCategory.LOGIC
+                        BelCategory.ROUTING.value, BelCategory.LOGIC.value
                     ]
 
-                    pip_info.bel = self.bel_index_remap[orig_bel_index]
-                    assert tile_type.bel_data[
-                        pip_info.bel].bel_category == expected_category.value
+                    bel_index = bel_index_remap[orig_bel_index]
+                    pip_info.bel = bel_index
+                    assert bel_data[
+                        bel_index].bel_category == expected_category
                     pip_info.extra_data = pin_idx
                 else:
-                    assert pip.type == FlattenedPipType.SITE_PIN
+                    assert pip_type == FlattenedPipType.SITE_PIN
                     site_pin = site_type.pins[pip.pip_index]
                     bel_idx, pin_idx = site.bel_pin_index_to_bel_index[
                         site_pin.belpin]
-                    pip_info.bel = self.bel_index_remap[
-                        site.bel_to_bel_index[bel_idx]]
+                    orig_bel_index = site.bel_to_bel_index[bel_idx]
+                    bel_index = bel_index_remap[orig_bel_index]
+                    pip_info.bel = bel_index
                     pip_info.extra_data = pin_idx
-                    assert tile_type.bel_data[
-                        pip_info.
-                        bel].bel_category == BelCategory.SITE_PORT.value
+                    assert bel_data[bel_index].bel_category == \
+                        BelCategory.SITE_PORT.value
             else:
-                assert pip.type == FlattenedPipType.TILE_PIP
+                assert pip_type == FlattenedPipType.TILE_PIP
                 pip_info.site = -1
                 pip_info.site_variant = -1
 
@@ -790,20 +881,23 @@ class FlattenedTileType():
 
         emit_constraints(tile_type, self.tile_constraints, cell_bel_mapper)
 
-        for site in self.sites:
-            tile_type.site_types.append(site.site_type_name)
+        tile_type.site_types.extend(site_type_names)
 
         return tile_type
 
 
 class CellBelMapper():
     def __init__(self, device, constids, disabled_cell_bel_maps):
-        def is_cell_bel_map_disabled(cell, bel):
-            for exclusion_map in disabled_cell_bel_maps:
-                if exclusion_map['cell'] == cell:
-                    return bel in exclusion_map['bels']
+        # Map of cell type to the BELs that cell may not be placed at. Only
+        # the first exclusion map for a cell is used.
+        disabled_bels_for_cell = {}
+        for exclusion_map in disabled_cell_bel_maps:
+            if exclusion_map['cell'] not in disabled_bels_for_cell:
+                disabled_bels_for_cell[
+                    exclusion_map['cell']] = exclusion_map['bels']
 
-            return False
+        strs = device.strs
+        cell_bel_maps = list(device.device_resource_capnp.cellBelMap)
 
         # Emit cell names so that they are compact list.
         self.cells_in_order = []
@@ -816,8 +910,8 @@ class CellBelMapper():
         self.cell_to_bel_constraints = {}
         self.bel_to_bel_buckets = {}
 
-        for cell_bel_map in device.device_resource_capnp.cellBelMap:
-            cell_name = device.strs[cell_bel_map.cell]
+        for cell_bel_map in cell_bel_maps:
+            cell_name = strs[cell_bel_map.cell]
             self.cells_in_order.append(cell_name)
             self.cell_names[cell_name] = constids.get_index(cell_name)
 
@@ -836,83 +930,105 @@ class CellBelMapper():
 
         self.cell_to_bel_map = {}
 
-        for cell_bel_map in device.device_resource_capnp.cellBelMap:
-            cell_type = device.strs[cell_bel_map.cell]
+        cell_to_bel_common_pins = self.cell_to_bel_common_pins
+        cell_to_bel_parameter_pins = self.cell_to_bel_parameter_pins
+        for cell_bel_map in cell_bel_maps:
+            cell_type = strs[cell_bel_map.cell]
             assert cell_type in self.cell_names
 
+            disabled_bels = disabled_bels_for_cell.get(cell_type, ())
             bels = set()
 
             for common_pin in cell_bel_map.commonPins:
-                pins = []
-                for pin in common_pin.pins:
-                    pins.append((device.strs[pin.cellPin],
-                                 device.strs[pin.belPin]))
+                # Shared by every (site type, BEL) key below.
+                pins = tuple((strs[pin.cellPin], strs[pin.belPin])
+                             for pin in common_pin.pins)
 
                 for site_types_and_bels in common_pin.siteTypes:
-                    site_type = device.strs[site_types_and_bels.siteType]
+                    site_type = strs[site_types_and_bels.siteType]
                     for bel_str_id in site_types_and_bels.bels:
-                        bel = device.strs[bel_str_id]
+                        bel = strs[bel_str_id]
 
-                        if is_cell_bel_map_disabled(cell_type, bel):
+                        if bel in disabled_bels:
                             continue
 
                         bels.add((site_type, bel))
 
                         key = (cell_type, site_type, bel)
-                        assert key not in self.cell_to_bel_common_pins
-                        self.cell_to_bel_common_pins[key] = pins
+                        assert key not in cell_to_bel_common_pins
+                        cell_to_bel_common_pins[key] = pins
 
             for parameter_pin in cell_bel_map.parameterPins:
-                pins = []
-                for pin in parameter_pin.pins:
-                    pins.append((device.strs[pin.cellPin],
-                                 device.strs[pin.belPin]))
+                pins = tuple((strs[pin.cellPin], strs[pin.belPin])
+                             for pin in parameter_pin.pins)
 
                 for parameter in parameter_pin.parametersSiteTypes:
-                    param_key = device.strs[parameter.parameter.key]
-                    which = parameter.parameter.which()
+                    cell_parameter = parameter.parameter
+                    param_key = strs[cell_parameter.key]
+                    which = cell_parameter.which()
                     assert which == 'textValue'
-                    param_value = device.strs[parameter.parameter.textValue]
+                    param_value = strs[cell_parameter.textValue]
 
-                    bel = device.strs[parameter.bel]
+                    bel = strs[parameter.bel]
 
-                    if is_cell_bel_map_disabled(cell_type, bel):
+                    if bel in disabled_bels:
                         continue
 
-                    site_type = device.strs[parameter.siteType]
+                    site_type = strs[parameter.siteType]
                     bels.add((site_type, bel))
 
                     key = cell_type, site_type, bel
-                    if key not in self.cell_to_bel_parameter_pins:
-                        self.cell_to_bel_parameter_pins[key] = {}
+                    if key not in cell_to_bel_parameter_pins:
+                        cell_to_bel_parameter_pins[key] = {}
+                    parameter_pins = cell_to_bel_parameter_pins[key]
 
-                    assert (param_key, param_value
-                            ) not in self.cell_to_bel_parameter_pins[key]
-                    self.cell_to_bel_parameter_pins[key][(param_key,
-                                                          param_value)] = pins
+                    assert (param_key, param_value) not in parameter_pins
+                    parameter_pins[(param_key, param_value)] = pins
 
             self.cell_to_bel_map[cell_type] = bels
 
+        # Reverse map of (site type, BEL) to the cells that can be placed
+        # there.  The cell sets are frozen, because FlattenedBel.valid_cells
+        # holds them directly.
+        bel_to_cells = {}
+        for cell_type, bels in self.cell_to_bel_map.items():
+            for bel_key in bels:
+                if bel_key not in bel_to_cells:
+                    bel_to_cells[bel_key] = set()
+
+                bel_to_cells[bel_key].add(cell_type)
+
+        self.bel_to_cells = {}
+        for bel_key, cells in bel_to_cells.items():
+            self.bel_to_cells[bel_key] = frozenset(cells)
+
         self.bels = set()
+        self.site_type_bels = []
         for site_type in device.device_resource_capnp.siteTypeList:
-            for bel in site_type.bels:
-                self.bels.add((device.strs[site_type.name],
-                               device.strs[bel.name]))
+            site_type_name = strs[site_type.name]
+            bel_names = [strs[bel.name] for bel in site_type.bels]
+            self.site_type_bels.append((site_type_name, bel_names))
+            self.bels.update(
+                (site_type_name, bel_name) for bel_name in bel_names)
+
+        # BEL bucket of each BEL, indexed by site type index and then BEL
+        # index. Populated by handle_remaining.
+        self.site_type_bel_buckets = None
 
     def get_cell_bel_map_index(self, cell_type, tile_type, site_index,
                                site_type, bel):
-        if cell_type not in self.cell_to_bel_map:
-            return -1
-
-        if (site_type, bel) not in self.cell_to_bel_map[cell_type]:
+        bels = self.cell_to_bel_map.get(cell_type)
+        if bels is None or (site_type, bel) not in bels:
             return -1
 
+        cell_site_bel_index = self.cell_site_bel_index
         key = cell_type, tile_type, site_index, site_type, bel
-        if key not in self.cell_site_bel_index:
-            index = len(self.cell_site_bel_index)
-            self.cell_site_bel_index[key] = index
+        index = cell_site_bel_index.get(key)
+        if index is None:
+            index = len(cell_site_bel_index)
+            cell_site_bel_index[key] = index
 
-        return self.cell_site_bel_index[key]
+        return index
 
     def make_bel_bucket(self, bel_bucket_name, cell_names):
         assert bel_bucket_name not in self.bel_buckets
@@ -920,21 +1036,19 @@ class CellBelMapper():
         bels_in_bucket = set()
         cells_in_bucket = set(cell_names)
 
-        while True:
-            pre_loop_counts = (len(bels_in_bucket), len(cells_in_bucket))
-
-            for cell_name in cells_in_bucket:
-                bels_in_bucket |= self.cell_to_bel_map[cell_name]
+        # Walk the cell <-> BEL graph from the seed cells, visiting each cell
+        # and BEL once.
+        cells_to_visit = list(cells_in_bucket)
+        while cells_to_visit:
+            cell_name = cells_to_visit.pop()
 
-            for bel in bels_in_bucket:
-                for cell, bels in self.cell_to_bel_map.items():
-                    if bel in bels:
-                        cells_in_bucket.add(cell)
+            new_bels = self.cell_to_bel_map[cell_name] - bels_in_bucket
+            bels_in_bucket |= new_bels
 
-            post_loop_counts = (len(bels_in_bucket), len(cells_in_bucket))
-
-            if pre_loop_counts == post_loop_counts:
-                break
+            for bel in new_bels:
+                new_cells = self.bel_to_cells[bel] - cells_in_bucket
+                cells_in_bucket |= new_cells
+                cells_to_visit.extend(new_cells)
 
         assert bel_bucket_name not in self.bel_buckets
         self.bel_buckets.add(bel_bucket_name)
@@ -954,9 +1068,8 @@ class CellBelMapper():
         for cell in sorted(remaining_cells):
             self.make_bel_bucket(cell, [cell])
 
-        remaining_bels = set(self.bels)
-        for bels in self.cell_to_bel_map.values():
-            remaining_bels -= bels
+        # bel_to_cells is keyed by every BEL that some cell can use.
+        remaining_bels = self.bels.difference(self.bel_to_cells)
 
         bel_bucket_name = 'UNPLACABLE_BELS'
         assert bel_bucket_name not in self.bel_buckets
@@ -968,6 +1081,14 @@ class CellBelMapper():
         assert bel_bucket_name not in self.bel_buckets
         self.bel_buckets.add(bel_bucket_name)
 
+        # Every BEL now has a BEL bucket, so build the index based view.
+        self.site_type_bel_buckets = []
+        for site_type, bel_names in self.site_type_bels:
+            self.site_type_bel_buckets.append([
+                self.bel_to_bel_buckets[site_type, bel_name]
+                for bel_name in bel_names
+            ])
+
     def get_cells(self):
         return self.cells_in_order
 
@@ -989,9 +1110,15 @@ class CellBelMapper():
     def bel_to_bel_bucket(self, site_type, bel):
         return self.bel_to_bel_buckets[(site_type, bel)]
 
+    def bel_buckets_for_site_type(self, site_type_index):
+        return self.site_type_bel_buckets[site_type_index]
+
     def bels_for_cell(self, cell):
         return self.cell_to_bel_map[cell]
 
+    def cells_for_bel(self, site_type, bel):
+        return self.bel_to_cells.get((site_type, bel), ())
+
 
 DEBUG_BEL_BUCKETS = False
 
@@ -1076,19 +1203,30 @@ class ConstantNetworkGenerator():
 
         tile_type.site_types.append(self.site_type)
 
-        self.cell_bel_mapper.cell_to_bel_map[
-            self.constants.gnd_cell_name] = set(
-                ((self.site_type, self.constants.gnd_cell_name), ))
-        self.cell_bel_mapper.cell_to_bel_map[
-            self.constants.vcc_cell_name] = set(
-                ((self.site_type, self.constants.vcc_cell_name), ))
+        mapper = self.cell_bel_mapper
+        gnd_cell_name = self.constants.gnd_cell_name
+        vcc_cell_name = self.constants.vcc_cell_name
+        num_cells = len(mapper.get_cells())
+
+        # The constant cells can only be placed at the constant source BELs,
+        # so replace their entries in both of the mapper's maps.
+        for cell_name in (gnd_cell_name, vcc_cell_name):
+            for old_bel_key in mapper.cell_to_bel_map.get(cell_name, ()):
+                cells = mapper.bel_to_cells[old_bel_key] - set((cell_name, ))
+                if cells:
+                    mapper.bel_to_cells[old_bel_key] = cells
+                else:
+                    del mapper.bel_to_cells[old_bel_key]
+
+            bel_key = (self.site_type, cell_name)
+            mapper.cell_to_bel_map[cell_name] = set((bel_key, ))
+            mapper.bel_to_cells[bel_key] = frozenset((cell_name, ))
 
         # Create BELs to be the source of the constant networks.
         gnd_bel = BelInfo()
-        gnd_bel.name = self.constants.gnd_cell_name
-        gnd_bel.type = self.constants.gnd_cell_name
-        gnd_bel.bel_bucket = self.cell_bel_mapper.cell_to_bel_bucket(
-            self.constants.gnd_cell_name)
+        gnd_bel.name = gnd_cell_name
+        gnd_bel.type = gnd_cell_name
+        gnd_bel.bel_bucket = mapper.cell_to_bel_bucket(gnd_cell_name)
 
         gnd_bel.ports.append(self.constants.gnd_cell_port)
         gnd_bel.types.append(PortType.PORT_OUT)
@@ -1099,26 +1237,23 @@ class ConstantNetworkGenerator():
         gnd_bel.bel_category = BelCategory.LOGIC.value
         gnd_bel.synthetic = SyntheticType.GND.value
 
-        gnd_bel.pin_map = [-1 for _ in self.cell_bel_mapper.get_cells()]
-        gnd_cell_idx = self.cell_bel_mapper.get_cell_index(
-            self.constants.gnd_cell_name)
-        gnd_bel.pin_map[
-            gnd_cell_idx] = self.cell_bel_mapper.get_cell_bel_map_index(
-                cell_type=self.constants.gnd_cell_name,
-                tile_type=self.tile_type_name,
-                site_index=0,
-                site_type=self.site_type,
-                bel=gnd_bel.name)
+        gnd_bel.pin_map = array('i', [-1]) * num_cells
+        gnd_cell_idx = mapper.get_cell_index(gnd_cell_name)
+        gnd_bel.pin_map[gnd_cell_idx] = mapper.get_cell_bel_map_index(
+            cell_type=gnd_cell_name,
+            tile_type=self.tile_type_name,
+            site_index=0,
+            site_type=self.site_type,
+            bel=gnd_bel.name)
         assert gnd_bel.pin_map[gnd_cell_idx] != -1
 
         assert len(tile_type.bel_data) == self.constants.gnd_bel_index
         tile_type.bel_data.append(gnd_bel)
 
         vcc_bel = BelInfo()
-        vcc_bel.name = self.constants.vcc_cell_name
-        vcc_bel.type = self.constants.vcc_cell_name
-        vcc_bel.bel_bucket = self.cell_bel_mapper.cell_to_bel_bucket(
-            self.constants.vcc_cell_name)
+        vcc_bel.name = vcc_cell_name
+        vcc_bel.type = vcc_cell_name
+        vcc_bel.bel_bucket = mapper.cell_to_bel_bucket(vcc_cell_name)
 
         vcc_bel.ports.append(self.constants.vcc_cell_port)
         vcc_bel.types.append(PortType.PORT_OUT)
@@ -1129,30 +1264,28 @@ class ConstantNetworkGenerator():
         vcc_bel.bel_category = BelCategory.LOGIC.value
         vcc_bel.synthetic = SyntheticType.VCC.value
 
-        vcc_bel.pin_map = [-1 for _ in self.cell_bel_mapper.get_cells()]
-        vcc_cell_idx = self.cell_bel_mapper.get_cell_index(
-            self.constants.vcc_cell_name)
-        vcc_bel.pin_map[
-            vcc_cell_idx] = self.cell_bel_mapper.get_cell_bel_map_index(
-                cell_type=self.constants.vcc_cell_name,
-                tile_type=self.tile_type_name,
-                site_index=0,
-                site_type=self.site_type,
-                bel=vcc_bel.name)
+        vcc_bel.pin_map = array('i', [-1]) * num_cells
+        vcc_cell_idx = mapper.get_cell_index(vcc_cell_name)
+        vcc_bel.pin_map[vcc_cell_idx] = mapper.get_cell_bel_map_index(
+            cell_type=vcc_cell_name,
+            tile_type=self.tile_type_name,
+            site_index=0,
+            site_type=self.site_type,
+            bel=vcc_bel.name)
         assert vcc_bel.pin_map[vcc_cell_idx] != -1
 
         assert len(tile_type.bel_data) == self.constants.vcc_bel_index
         tile_type.bel_data.append(vcc_bel)
 
-        self.cell_bel_mapper.bels.add((self.site_name, gnd_bel.name))
-        self.cell_bel_mapper.bels.add((self.site_name, vcc_bel.name))
+        mapper.bels.add((self.site_name, gnd_bel.name))
+        mapper.bels.add((self.site_name, vcc_bel.name))
 
-        key = (self.constants.gnd_cell_name, self.site_type, gnd_bel.name)
-        self.cell_bel_mapper.cell_to_bel_common_pins[key] = ((
+        key = (gnd_cell_name, self.site_type, gnd_bel.name)
+        mapper.cell_to_bel_common_pins[key] = ((
             self.constants.gnd_cell_port, self.constants.gnd_cell_port), )
 
-        key = (self.constants.vcc_cell_name, self.site_type, vcc_bel.name)
-        self.cell_bel_mapper.cell_to_bel_common_pins[key] = ((
+        key = (vcc_cell_name, self.site_type, vcc_bel.name)
+        mapper.cell_to_bel_common_pins[key] = ((
             self.constants.vcc_cell_port, self.constants.vcc_cell_port), )
 
         tile_type.name = self.tile_type_name
@@ -1333,9 +1466,8 @@ class ConstantNetworkGenerator():
         site_inst.site_name = self.site_name
         site_inst.site_type = self.site_type
 
-        self.chip_info.tiles[tile_idx].tile_wire_to_node = [
-            -1 for _ in range(len(self.tile_type.wire_data))
-        ]
+        self.chip_info.tiles[tile_idx].tile_wire_to_node = array(
+            'i', [-1]) * len(self.tile_type.wire_data)
 
         # Create nodes for the global constant network
         gnd_node_idx = len(self.chip_info.nodes)
@@ -1382,6 +1514,19 @@ class ConstantNetworkGenerator():
             else:
                 assert False, site_source.constant
 
+        # Resolve the constant site types to site type indices once, so the
+        # tile type scan below compares indices instead of decoding names.
+        site_type_list = device.device_resource_capnp.siteTypeList
+        site_type_indices_with_gnd = set()
+        site_type_indices_with_vcc = set()
+        for site_type_idx, site_type in enumerate(site_type_list):
+            site_type_name = device.strs[site_type.name]
+            if site_type_name in site_types_with_gnd:
+                site_type_indices_with_gnd.add(site_type_idx)
+
+            if site_type_name in site_types_with_vcc:
+                site_type_indices_with_vcc.add(site_type_idx)
+
         tile_types_with_gnd = set()
         tile_types_with_vcc = set()
 
@@ -1402,29 +1547,25 @@ class ConstantNetworkGenerator():
                     assert False, wire_constant.constant
 
             for site_in_tile_type in tile_type_data.siteTypes:
-                site_type = device.device_resource_capnp.siteTypeList[
-                    site_in_tile_type.primaryType]
+                primary_type = site_in_tile_type.primaryType
+                site_type_indices = [primary_type]
+                site_type_indices.extend(
+                    site_type_list[primary_type].altSiteTypes)
 
-                site_type_name = device.strs[site_type.name]
-                if site_type_name in site_types_with_gnd:
+                if not site_type_indices_with_gnd.isdisjoint(
+                        site_type_indices):
                     tile_types_with_gnd.add(tile_type_idx)
 
-                if site_type_name in site_types_with_vcc:
+                if not site_type_indices_with_vcc.isdisjoint(
+                        site_type_indices):
                     tile_types_with_vcc.add(tile_type_idx)
 
-                for alt_site_type_idx in site_type.altSiteTypes:
-                    alt_site_type = device.device_resource_capnp.siteTypeList[
-                        alt_site_type_idx]
-
-                    site_type_name = device.strs[alt_site_type.name]
-                    if site_type_name in site_types_with_gnd:
-                        tile_types_with_gnd.add(tile_type_idx)
-
-                    if site_type_name in site_types_with_vcc:
-                        tile_types_with_vcc.add(tile_type_idx)
+        # Local constant wire index of each tile type, or None if the tile
+        # type does not need that constant.
+        num_tile_types = len(self.chip_info.tile_types)
 
         # Create gnd local wire in each type that needs it
-        tile_type_gnd_wires = {}
+        tile_type_gnd_wires = [None] * num_tile_types
         for tile_type_idx in tile_types_with_gnd:
             tile_type = self.chip_info.tile_types[tile_type_idx]
 
@@ -1437,30 +1578,8 @@ class ConstantNetworkGenerator():
 
             tile_type_gnd_wires[tile_type_idx] = gnd_wire_idx
 
-        # Add gnd local wire in each instance to node
-        for tile_idx, tile in enumerate(self.chip_info.tiles):
-            if tile.type not in tile_types_with_gnd:
-                continue
-
-            gnd_wire_idx = tile_type_gnd_wires[tile.type]
-            assert gnd_wire_idx >= len(
-                tile.tile_wire_to_node), (gnd_wire_idx,
-                                          len(tile.tile_wire_to_node),
-                                          len(tile_type.wire_data))
-
-            while gnd_wire_idx > len(tile.tile_wire_to_node):
-                tile.tile_wire_to_node.append(-1)
-
-            tile.tile_wire_to_node.append(gnd_node_idx)
-
-            wire_ref = TileWireRef()
-            wire_ref.tile = tile_idx
-            wire_ref.index = gnd_wire_idx
-
-            gnd_node.tile_wires.append(wire_ref)
-
         # Create vcc local wire in each type that needs it
-        tile_type_vcc_wires = {}
+        tile_type_vcc_wires = [None] * num_tile_types
         for tile_type_idx in tile_types_with_vcc:
             tile_type = self.chip_info.tile_types[tile_type_idx]
 
@@ -1473,28 +1592,46 @@ class ConstantNetworkGenerator():
 
             tile_type_vcc_wires[tile_type_idx] = vcc_wire_idx
 
-        # Add vcc local wire in each instance to node
+        # Add gnd and vcc local wires in each instance to their nodes.
+        #
+        # Both are handled in a single pass over the tiles.  The gnd wire of
+        # a tile type is created before its vcc wire, so gnd is appended
+        # first.
         for tile_idx, tile in enumerate(self.chip_info.tiles):
-            if tile.type not in tile_types_with_vcc:
-                continue
-
+            gnd_wire_idx = tile_type_gnd_wires[tile.type]
             vcc_wire_idx = tile_type_vcc_wires[tile.type]
-            assert vcc_wire_idx >= len(tile.tile_wire_to_node)
+            tile_wire_to_node = tile.tile_wire_to_node
+
+            if gnd_wire_idx is not None:
+                assert gnd_wire_idx >= len(tile_wire_to_node), (
+                    gnd_wire_idx, len(tile_wire_to_node))
+
+                tile_wire_to_node.extend(
+                    [-1] * (gnd_wire_idx - len(tile_wire_to_node)))
+                tile_wire_to_node.append(gnd_node_idx)
 
-            while vcc_wire_idx > len(tile.tile_wire_to_node):
-                tile.tile_wire_to_node.append(-1)
+                wire_ref = TileWireRef()
+                wire_ref.tile = tile_idx
+                wire_ref.index = gnd_wire_idx
 
-            tile.tile_wire_to_node.append(vcc_node_idx)
+                gnd_node.tile_wires.append(wire_ref)
 
-            wire_ref = TileWireRef()
-            wire_ref.tile = tile_idx
-            wire_ref.index = vcc_wire_idx
+            if vcc_wire_idx is not None:
+                assert vcc_wire_idx >= len(tile_wire_to_node)
 
-            vcc_node.tile_wires.append(wire_ref)
+                tile_wire_to_node.extend(
+                    [-1] * (vcc_wire_idx - len(tile_wire_to_node)))
+                tile_wire_to_node.append(vcc_node_idx)
+
+                wire_ref = TileWireRef()
+                wire_ref.tile = tile_idx
+                wire_ref.index = vcc_wire_idx
+
+                vcc_node.tile_wires.append(wire_ref)
 
         for tile_type_idx in (tile_types_with_gnd | tile_types_with_vcc):
-            gnd_wire_idx = tile_type_gnd_wires.get(tile_type_idx, None)
-            vcc_wire_idx = tile_type_vcc_wires.get(tile_type_idx, None)
+            gnd_wire_idx = tile_type_gnd_wires[tile_type_idx]
+            vcc_wire_idx = tile_type_vcc_wires[tile_type_idx]
 
             self.connect_tile_type(tile_type_idx, gnd_wire_idx, vcc_wire_idx,
                                    bel_pins_connected_to_gnd,
@@ -2227,9 +2364,35 @@ def populate_macro_rules(device, chip_info):
         chip_info.macro_rules.append(exp_data)
 
 
+def populate_packages(device, chip_info):
+    strs = device.strs
+
+    for package in device.device_resource_capnp.packages:
+        package_data = Package()
+        package_data.package = strs[package.name]
+        chip_info.packages.append(package_data)
+
+        for package_pin in package.packagePins:
+            site = package_pin.site
+            if site.which() == 'noSite':
+                continue
+            bel = package_pin.bel
+            if bel.which() == 'noBel':
+                continue
+
+            package_pin_data = PackagePin()
+            package_pin_data.package_pin = strs[package_pin.packagePin]
+            package_pin_data.site = strs[site.site]
+            package_pin_data.bel = strs[bel.bel]
+
+            package_data.package_pins.append(package_pin_data)
+
+
 def populate_chip_info(device, constids, device_config):
     assert len(constids.values) == 1
 
+    strs = device.strs
+
     bel_bucket_seeds = device_config.get('buckets', [])
     global_buffer_bels = device_config.get('global_buffer_bels', [])
     disabled_routethrus = device_config.get('disabled_routethroughs', [])
@@ -2347,42 +2510,48 @@ def populate_chip_info(device, constids, device_config):
         chip_info.tile_types.append(tile_type_info)
 
         # Create map of tile wires to wire in tile id.
-        per_tile_map = {}
-        for idx, wire in enumerate(tile_type_info.wire_data):
-            if wire.site != -1:
-                # Only care about tile wires!
-                break
-
-            assert wire.name not in per_tile_map
-            per_tile_map[wire.name] = idx
+        #
+        # Only care about tile wires! These are emitted before any site
+        # wires.
+        wire_data = tile_type_info.wire_data
+        tile_wire_count = next(
+            (idx for idx, wire in enumerate(wire_data) if wire.site != -1),
+            len(wire_data))
+        per_tile_map = {
+            wire_data[idx].name: idx
+            for idx in range(tile_wire_count)
+        }
+        assert len(per_tile_map) == tile_wire_count
 
         tile_wire_to_wire_in_tile_index.append(per_tile_map)
-        if len(per_tile_map) == 0:
-            num_tile_wires.append(0)
-        else:
-            num_tile_wires.append(max(per_tile_map.values()) + 1)
+        num_tile_wires.append(tile_wire_count)
 
     constants = ConstantNetworkGenerator(device, chip_info, cell_bel_mapper)
 
     # Emit cell bel pin map.
-    for key, idx in sorted(
-            cell_bel_mapper.cell_site_bel_index.items(),
-            key=lambda item: item[1]):
+    #
+    # get_cell_bel_map_index hands out indices in insertion order, so
+    # cell_site_bel_index is already ordered by index.
+    cell_bel_maps = chip_info.cell_map.cell_bel_map
+    cell_to_bel_common_pins = cell_bel_mapper.cell_to_bel_common_pins
+    cell_to_bel_parameter_pins = cell_bel_mapper.cell_to_bel_parameter_pins
+    cell_to_bel_constraints = cell_bel_mapper.cell_to_bel_constraints
+    for key, idx in cell_bel_mapper.cell_site_bel_index.items():
         cell_type, tile_type, site_index, site_type, bel = key
+        assert idx == len(cell_bel_maps)
 
         cell_bel_map = CellBelMap(cell_type, tile_type, site_index, bel)
-        chip_info.cell_map.cell_bel_map.append(cell_bel_map)
+        cell_bel_maps.append(cell_bel_map)
 
         pin_key = (cell_type, site_type, bel)
-        if pin_key in cell_bel_mapper.cell_to_bel_common_pins:
-            for (cell_pin,
-                 bel_pin) in cell_bel_mapper.cell_to_bel_common_pins[pin_key]:
+        common_pins = cell_to_bel_common_pins.get(pin_key)
+        if common_pins is not None:
+            for (cell_pin, bel_pin) in common_pins:
                 cell_bel_map.common_pins.append(CellBelPin(cell_pin, bel_pin))
 
-        if pin_key in cell_bel_mapper.cell_to_bel_parameter_pins:
-            for (param_key, param_value
-                 ), pins in cell_bel_mapper.cell_to_bel_parameter_pins[
-                     pin_key].items():
+        parameter_pins = cell_to_bel_parameter_pins.get(pin_key)
+        if parameter_pins is not None:
+            for (param_key, param_value), pins in parameter_pins.items():
                 parameter = ParameterPins()
                 parameter.key = param_key
                 parameter.value = param_value
@@ -2391,10 +2560,9 @@ def populate_chip_info(device, constids, device_config):
 
                 cell_bel_map.parameter_pins.append(parameter)
 
-        cell_bel_map = chip_info.cell_map.cell_bel_map[idx]
-        if idx in cell_bel_mapper.cell_to_bel_constraints:
-            cell_bel_map.constraints = cell_bel_mapper.cell_to_bel_constraints[
-                idx]
+        constraints = cell_to_bel_constraints.get(idx)
+        if constraints is not None:
+            cell_bel_map.constraints = constraints
 
     # Emit default cell pin connections
     for conn in device.get_constants().DEFAULT_CONNS:
@@ -2407,51 +2575,61 @@ def populate_chip_info(device, constids, device_config):
             conn_data.cell_pins.append(pin_data)
         chip_info.constants.default_conns.append(conn_data)
 
-    tiles = {}
+    # Site type names of the sites in each tile type, as
+    # (primary site type, [alternate site types]).
+    site_type_list = device.device_resource_capnp.siteTypeList
+    tile_type_site_types = []
+    for tile_type in device.device_resource_capnp.tileTypeList:
+        site_types = []
+        for site_type_in_tile_type in tile_type.siteTypes:
+            site_type = site_type_list[site_type_in_tile_type.primaryType]
+            alt_pins = site_type_in_tile_type.altPinsToPrimaryPins
+            alt_site_type_names = [
+                strs[site_type_list[alt_site_type_index].name] for
+                alt_site_type_index, _ in zip(site_type.altSiteTypes, alt_pins)
+            ]
+            site_types.append((strs[site_type.name], alt_site_type_names))
+
+        tile_type_site_types.append(site_types)
+
+    tiles = []
+    # Map of tile name string id to tile index.
     tile_name_to_tile_index = {}
+    width = 0
+    height = 0
 
-    for tile_index, tile in enumerate(device.device_resource_capnp.tileList):
+    sites = chip_info.sites
+    for tile in device.device_resource_capnp.tileList:
         tile_info = TileInstInfo()
 
-        tile_info.name = device.strs[tile.name]
+        tile_info.name = strs[tile.name]
         tile_info.type = tile.type
-        tile_info.tile_wire_to_node = list(
-            [-1 for _ in range(num_tile_wires[tile.type])])
-        tile_info.tile_wire_to_type = list(
-            [-1 for _ in range(num_tile_wires[tile.type])])
+        tile_wire_count = num_tile_wires[tile.type]
+        tile_info.tile_wire_to_node = array('i', [-1]) * tile_wire_count
+        tile_info.tile_wire_to_type = array('i', [-1]) * tile_wire_count
 
-        tile_type = device.device_resource_capnp.tileTypeList[tile.type]
-
-        for site_type_in_tile_type, site in zip(tile_type.siteTypes,
-                                                tile.sites):
-            site_name = device.strs[site.name]
+        for (site_type_name, alt_site_type_names), site in zip(
+                tile_type_site_types[tile.type], tile.sites):
+            site_name = strs[site.name]
+            site_prefix = site_name + '.'
 
             # Emit primary type
             site_info = SiteInstInfo()
-            site_type = device.device_resource_capnp.siteTypeList[
-                site_type_in_tile_type.primaryType]
-            site_type_name = device.strs[site_type.name]
-            site_info.name = '{}.{}'.format(site_name, site_type_name)
+            site_info.name = site_prefix + site_type_name
             site_info.site_name = site_name
             site_info.site_type = site_type_name
 
-            tile_info.sites.append(len(chip_info.sites))
-            chip_info.sites.append(site_info)
+            tile_info.sites.append(len(sites))
+            sites.append(site_info)
 
-            for site_variant, (alt_site_type_index, _) in enumerate(
-                    zip(site_type.altSiteTypes,
-                        site_type_in_tile_type.altPinsToPrimaryPins)):
+            for alt_site_type_name in alt_site_type_names:
                 alt_site_info = SiteInstInfo()
-                alt_site_type = device.device_resource_capnp.siteTypeList[
-                    alt_site_type_index]
-                alt_site_type_name = device.strs[alt_site_type.name]
-                alt_site_info.name = '{}.{}'.format(site_name,
-                                                    alt_site_type_name)
+                alt_site_info.name = site_prefix + alt_site_type_name
                 alt_site_info.site_name = site_name
                 alt_site_info.site_type = alt_site_type_name
 
-                tile_info.sites.append(len(chip_info.sites))
-                chip_info.sites.append(alt_site_info)
+                tile_info.sites.append(len(sites))
+                sites.append(alt_site_info)
 
         assert len(tile_info.sites) == len(
             chip_info.tile_types[tile.type].site_types), (
@@ -2459,95 +2637,99 @@ def populate_chip_info(device, constids, device_config):
                 len(chip_info.tile_types[tile.type].site_types))
 
         # (x, y) = (col, row)
-        tiles[(tile.col, tile.row)] = (tile_index, tile_info)
+        tiles.append((tile.col, tile.row, tile.name, tile_info))
 
-    # Compute dimensions of grid
-    xs, ys = zip(*tiles.keys())
-    width = max(xs) + 1
-    height = max(ys) + 1
+        # Compute dimensions of grid
+        width = max(width, tile.col + 1)
+        height = max(height, tile.row + 1)
 
     chip_info.width = width
     chip_info.height = height
 
     # Add tile instances to chip_info in row major order (per arch.h).
-    for y in range(height):
-        for x in range(width):
-            key = x, y
+    grid = [None] * (width * height)
+    for x, y, tile_name, tile_info in tiles:
+        grid[y * width + x] = tile_name, tile_info
+
+    chip_tiles = chip_info.tiles
+    for tile in grid:
+        assert tile is not None
+        tile_name, tile_info = tile
+        tile_name_to_tile_index[tile_name] = len(chip_tiles)
+        chip_tiles.append(tile_info)
+
+    # Resolve each device wire to its tile and wire in tile index once, so
+    # that the node loop below only has to index into these arrays.
+    wire_tile_indices = array('i')
+    wire_in_tile_indices = array('i')
+
+    # Wires of the same tile are usually adjacent, so the per tile lookups
+    # are only redone when the tile changes.
+    last_tile = None
+    for wire in device.device_resource_capnp.wires:
+        tile = wire.tile
+        if tile != last_tile:
+            last_tile = tile
+            tile_index = tile_name_to_tile_index[tile]
+            tile_info = chip_tiles[tile_index]
+            per_tile_map = tile_wire_to_wire_in_tile_index[tile_info.type]
+            tile_wire_to_type = tile_info.tile_wire_to_type
 
-            _, tile_info = tiles[key]
-            tile_name_to_tile_index[tile_info.name] = len(chip_info.tiles)
-            chip_info.tiles.append(tile_info)
+        wire_name = strs[wire.wire]
+        wire_in_tile_id = per_tile_map[wire_name]
+
+        # Assign wire types
+        assert wire_in_tile_id < len(tile_wire_to_type), (
+            wire_in_tile_id, len(tile_wire_to_type), tile_info.type, wire_name)
+        tile_wire_to_type[wire_in_tile_id] = wire.type
+
+        wire_tile_indices.append(tile_index)
+        wire_in_tile_indices.append(wire_in_tile_id)
 
     # Output nodes
+    nodes = chip_info.nodes
+    tile_wire_to_nodes = [tile.tile_wire_to_node for tile in chip_tiles]
     for idx, node in enumerate(device.device_resource_capnp.nodes):
+        node_wires = node.wires
+
         # Skip nodes with only 1 wire!
-        if len(node.wires) == 1:
+        if len(node_wires) == 1:
             continue
 
         node_info = NodeInfo()
-        node_index = len(chip_info.nodes)
-        chip_info.nodes.append(node_info)
+        node_index = len(nodes)
+        nodes.append(node_info)
 
         # FIXME: Replace with actual node name?
         node_info.name = 'node_{}'.format(node_index)
 
-        for wire_index in node.wires:
-            wire = device.device_resource_capnp.wires[wire_index]
-            tile_name = device.strs[wire.tile]
-            wire_name = device.strs[wire.wire]
+        # Node wire count is known up front, so size tile_wires once.
+        node_tile_wires = [None] * len(node_wires)
+        node_info.tile_wires = node_tile_wires
 
-            tile_index = tile_name_to_tile_index[tile_name]
-            tile_info = chip_info.tiles[tile_index]
+        for i, wire_index in enumerate(node_wires):
+            tile_index = wire_tile_indices[wire_index]
+            wire_in_tile_id = wire_in_tile_indices[wire_index]
+            tile_wire_to_node = tile_wire_to_nodes[tile_index]
 
             # Make reference from tile to node.
-            wire_in_tile_id = tile_wire_to_wire_in_tile_index[tile_info.
-                                                              type][wire_name]
-            assert wire_in_tile_id < len(tile_info.tile_wire_to_node), (
-                wire_in_tile_id, len(tile_info.tile_wire_to_node),
-                tile_info.type, wire_name)
-            assert tile_info.tile_wire_to_node[wire_in_tile_id] == -1
-            tile_info.tile_wire_to_node[wire_in_tile_id] = node_index
+            assert tile_wire_to_node[wire_in_tile_id] == -1
+            tile_wire_to_node[wire_in_tile_id] = node_index
 
             # Make reference from node to tile.
             tile_wire = TileWireRef()
             tile_wire.tile = tile_index
             tile_wire.index = wire_in_tile_id
 
-            node_info.tile_wires.append(tile_wire)
-
-    for wire in device.device_resource_capnp.wires:
-        # Assign wire types
-        tile_name = device.strs[wire.tile]
-        wire_name = device.strs[wire.wire]
-        tile_index = tile_name_to_tile_index[tile_name]
-        tile_info = chip_info.tiles[tile_index]
-        wire_in_tile_id = tile_wire_to_wire_in_tile_index[tile_info.
-                                                          type][wire_name]
-        tile_info.tile_wire_to_type[wire_in_tile_id] = wire.type
+            node_tile_wires[i] = tile_wire
 
     constants.populate_constant_network()
 
-    for package in device.device_resource_capnp.packages:
-        package_data = Package()
-        package_data.package = device.strs[package.name]
-        chip_info.packages.append(package_data)
-
-        for package_pin in package.packagePins:
-            if package_pin.site.which() == 'noSite':
-                continue
-            if package_pin.site.which() == 'noBel':
-                continue
-
-            package_pin_data = PackagePin()
-            package_pin_data.package_pin = device.strs[package_pin.packagePin]
-            package_pin_data.site = device.strs[package_pin.site.site]
-            package_pin_data.bel = device.strs[package_pin.bel.bel]
-
-            package_data.package_pins.append(package_pin_data)
+    populate_packages(device, chip_info)
 
     for wire_type in device.device_resource_capnp.wireTypes:
         wire_type_data = WireType()
-        wire_type_data.name = device.strs[wire_type.name]
+        wire_type_data.name = strs[wire_type.name]
         wire_type_data.category = convert_wire_category(
             wire_type.category).value
         chip_info.wire_types.append(wire_type_data)
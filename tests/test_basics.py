@@ -17,7 +17,7 @@ import tempfile
 from fpga_interchange.interchange_capnp import Interchange, write_capnp_file, \
         CompressionFormat
 from fpga_interchange.logical_netlist import LogicalNetlist
-from fpga_interchange.physical_netlist import PhysicalNetlist
+from fpga_interchange.physical_netlist import PhysicalNetlist, Placement
 from example_netlist import example_logical_netlist, example_physical_netlist
 
 
@@ -133,3 +133,30 @@ class TestRoundTrip(unittest.TestCase):
                         interchange,
                         compression_format=compression_format,
                         is_packed=packed)
+
+
+class TestPhysicalNetlist(unittest.TestCase):
+    def test_physical_netlist_properties(self):
+        properties = {'DESIGN_MODE': 'ROUTED'}
+        phys_netlist = PhysicalNetlist('xc7a50tfgg484-1', properties)
+        self.assertEqual(phys_netlist.properties, properties)
+
+        # Properties are copied, and not shared between netlists.
+        phys_netlist.properties['KEY'] = 'VALUE'
+        self.assertNotIn('KEY', properties)
+        self.assertEqual(PhysicalNetlist('xc7a50tfgg484-1').properties, {})
+
+    def test_placement_other_bels_order(self):
+        placement = Placement(
+            cell_type='RAMD32',
+            cell_name='ram',
+            site='SLICE_X0Y0',
+            bel='A6LUT')
+
+        for bel in ['D6LUT', 'A6LUT', 'B6LUT', 'D6LUT', 'C6LUT']:
+            placement.add_bel_pin_to_cell_pin(
+                bel_pin='A1', cell_pin='I', bel=bel)
+
+        # Other BELs are kept once each, in the order they were first seen.
+        self.assertEqual(
+            list(placement.other_bels), ['D6LUT', 'B6LUT', 'C6LUT'])
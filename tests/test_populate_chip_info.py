@@ -0,0 +1,172 @@
+#/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2020  The F4PGA Authors.
+#
+# Use of this source code is governed by a ISC-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/ISC
+#
+# SPDX-License-Identifier: ISC
+
+import os
+import tempfile
+import unittest
+
+import capnp
+
+from fpga_interchange.chip_info import ChipInfo, TileTypeInfo
+from fpga_interchange.constraint_generator import ConstraintPrototype
+from fpga_interchange.constraints.model import Tag, ImpliesConstraint
+from fpga_interchange.nextpnr import PortType
+from fpga_interchange.populate_chip_info import direction_to_type, \
+        emit_constraints, populate_packages
+
+# Minimal schema mirroring the Direction enum of DeviceResources.BELPin.
+BEL_PIN_SCHEMA = """
+@0xd4c7b8a1f2e3c6b9;
+
+struct BELPin {
+  dir @0 :Direction;
+}
+
+enum Direction {
+  input @0;
+  output @1;
+  inout @2;
+}
+"""
+
+# Minimal schema mirroring DeviceResources.Package, with string indices as
+# plain integers.
+PACKAGE_SCHEMA = """
+@0xe1b2c3d4a5f60718;
+
+struct Device {
+  packages @0 :List(Package);
+}
+
+struct Package {
+  name @0 :UInt32;
+  packagePins @1 :List(PackagePin);
+
+  struct PackagePin {
+    packagePin @0 :UInt32;
+    site :union {
+      site @1 :UInt32;
+      noSite @2 :Void;
+    }
+    bel :union {
+      bel @3 :UInt32;
+      noBel @4 :Void;
+    }
+  }
+}
+"""
+
+
+def load_schema(schema_text):
+    with tempfile.TemporaryDirectory() as d:
+        schema_path = os.path.join(d, 'schema.capnp')
+        with open(schema_path, 'w') as f:
+            f.write(schema_text)
+
+        return capnp.load(schema_path)
+
+
+class FakeDevice():
+    def __init__(self, strs, device_resource_capnp):
+        self.strs = strs
+        self.device_resource_capnp = device_resource_capnp
+
+
+class FakeCellBelMapper():
+    def __init__(self):
+        self.cell_to_bel_constraints = {}
+
+    def get_cell_bel_map_index(self, cell_type, tile_type, site_index,
+                               site_type, bel):
+        return 0
+
+
+class TestPopulateChipInfo(unittest.TestCase):
+    def test_direction_to_type(self):
+        schema = load_schema(BEL_PIN_SCHEMA)
+
+        expected = {
+            'input': PortType.PORT_IN,
+            'output': PortType.PORT_OUT,
+            'inout': PortType.PORT_INOUT,
+        }
+        for direction, port_type in expected.items():
+            bel_pin = schema.BELPin.new_message(dir=direction)
+            with schema.BELPin.from_bytes(bel_pin.to_bytes()) as bel_pin:
+                self.assertEqual(direction_to_type(bel_pin.dir), port_type)
+
+    def test_emit_constraints_tag_order(self):
+        tile_constraints = ConstraintPrototype()
+        for tag_prefix in ['SLICE_X1.MODE', 'SLICE_X0.MODE', 'BRAM.MODE']:
+            tile_constraints.add_tag(
+                tag_prefix,
+                Tag(name='MODE',
+                    states=['LOGIC', 'DRAM', 'SRL'],
+                    default='LOGIC',
+                    matchers=[]))
+
+        tile_constraints.add_cell_placement_constraint(
+            cell_type='RAMD32',
+            site_index=1,
+            site_type='SLICEM',
+            bel='A6LUT',
+            tag='SLICE_X1.MODE',
+            constraint=ImpliesConstraint(
+                tag='SLICE_X1.MODE', state='DRAM', matchers=[], port=None))
+
+        tile_type = TileTypeInfo()
+        cell_bel_mapper = FakeCellBelMapper()
+        emit_constraints(tile_type, tile_constraints, cell_bel_mapper)
+
+        # Tags and their states are emitted sorted, independent of the order
+        # they were added in.
+        self.assertEqual([tag.tag_prefix for tag in tile_type.tags],
+                         ['BRAM.MODE', 'SLICE_X0.MODE', 'SLICE_X1.MODE'])
+        for tag in tile_type.tags:
+            self.assertEqual(tag.states, ['DRAM', 'LOGIC', 'SRL'])
+
+        constraint, = cell_bel_mapper.cell_to_bel_constraints[0]
+        self.assertEqual(constraint.tag, 2)
+        self.assertEqual(list(constraint.states), [0])
+
+    def test_populate_packages(self):
+        schema = load_schema(PACKAGE_SCHEMA)
+
+        strs = ['fgg484', 'A1', 'IOB_X0Y0', 'PAD', 'B1', 'C1', 'IOB_X0Y1']
+        device = schema.Device.new_message()
+        package = device.init('packages', 1)[0]
+        package.name = 0
+
+        package_pins = package.init('packagePins', 3)
+        package_pins[0].packagePin = 1
+        package_pins[0].site.site = 2
+        package_pins[0].bel.bel = 3
+
+        # Pins without a site or without a BEL are not emitted.
+        package_pins[1].packagePin = 4
+        package_pins[1].site.noSite = None
+        package_pins[1].bel.noBel = None
+
+        package_pins[2].packagePin = 5
+        package_pins[2].site.site = 6
+        package_pins[2].bel.noBel = None
+
+        chip_info = ChipInfo()
+        with schema.Device.from_bytes(device.to_bytes()) as device:
+            populate_packages(FakeDevice(strs, device), chip_info)
+
+        package_data, = chip_info.packages
+        self.assertEqual(package_data.package, 'fgg484')
+
+        package_pin, = package_data.package_pins
+        self.assertEqual(package_pin.package_pin, 'A1')
+        self.assertEqual(package_pin.site, 'IOB_X0Y0')
+        self.assertEqual(package_pin.bel, 'PAD')